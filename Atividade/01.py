@@ -1,5 +1,7 @@
 #Criaçao da classe que vai ser responsavel pelas tarefas
 class Atividade:
+    __slots__ = ("descricao", "concluida")
+
     def __init__(self,descricao):
         self.descricao = descricao
         self.concluida = False
@@ -34,14 +34,8 @@ class LoanAdmin(admin.ModelAdmin):
     @admin.action(description="Marcar como devolvido")
     def marcar_como_devolvido(self, request, queryset):
         """Ação em massa para marcar empréstimos como devolvidos."""
-        updated = 0
-        now = timezone.now()
-        
-        # Só marca os que ainda não foram devolvidos
-        for loan in queryset.filter(returned_at__isnull=True):
-            loan.returned_at = now
-            loan.save(update_fields=["returned_at"])
-            updated += 1
+        # Só marca os que ainda não foram devolvidos, com um único UPDATE
+        updated = queryset.filter(returned_at__isnull=True).update(returned_at=timezone.now())
         
         # Mensagem de sucesso
         self.message_user(request, f"{updated} empréstimo(s) marcados como devolvidos.")
\ No newline at end of file
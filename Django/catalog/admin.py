@@ -38,13 +38,8 @@ class LoanAdmin(admin.ModelAdmin):
 
 	@admin.action(description="Marcar como devolvido")
 	def marcar_como_devolvido(self, request, queryset):
-		# Percorre apenas empréstimos ainda ativos e define returned_at
-		updated = 0
-		now = timezone.now()
-		for loan in queryset.filter(returned_at__isnull=True):
-			loan.returned_at = now
-			loan.save(update_fields=["returned_at"])
-			updated += 1
+		# Um único UPDATE para todos os empréstimos ainda ativos (sem salvar um a um)
+		updated = queryset.filter(returned_at__isnull=True).update(returned_at=timezone.now())
 		self.message_user(request, f"{updated} empréstimo(s) marcados como devolvidos.")
 
 
@@ -0,0 +1,37 @@
+"""Cache de listas pequenas e pouco alteradas usadas nos formulários de busca.
+
+As views leem daqui em vez de consultar o banco a cada página; os sinais em
+`signals.py` apagam a chave quando os dados mudam.
+"""
+
+from django.core.cache import cache
+
+from .models import Book, Category
+
+CATEGORIES_KEY = "catalog:categories_v1"
+LANGUAGES_KEY = "catalog:languages_v1"
+CACHE_TIMEOUT = 300  # segundos
+LANGUAGES_CACHE_TIMEOUT = 600  # segundos
+
+
+def get_categories() -> list:
+	"""Lista de categorias (apenas id e nome) para os filtros."""
+	return cache.get_or_set(
+		CATEGORIES_KEY,
+		lambda: list(Category.objects.only("id", "name")),
+		CACHE_TIMEOUT,
+	)
+
+
+def get_languages() -> list:
+	"""Idiomas distintos do acervo (sem vazios), em ordem alfabética."""
+	return cache.get_or_set(
+		LANGUAGES_KEY,
+		lambda: list(
+			Book.objects.exclude(language="")
+			.order_by("language")
+			.values_list("language", flat=True)
+			.distinct()
+		),
+		LANGUAGES_CACHE_TIMEOUT,
+	)
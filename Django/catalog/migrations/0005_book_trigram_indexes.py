@@ -0,0 +1,42 @@
+"""Índices trigram (pg_trgm) para a busca livre do catálogo.
+
+A busca `icontains` vira `UPPER(coluna) LIKE UPPER('%termo%')` no PostgreSQL,
+que um índice B-tree comum não atende. Um índice GIN com `gin_trgm_ops` sobre
+a mesma expressão UPPER(...) permite ao planner responder esse LIKE pelo índice.
+
+Só se aplica ao PostgreSQL; em outros bancos (ex.: SQLite em desenvolvimento)
+a migração não faz nada.
+"""
+
+from django.db import migrations
+
+TRGM_COLUMNS = ("title", "author", "isbn")
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for column in TRGM_COLUMNS:
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS catalog_book_{column}_trgm "
+            f"ON catalog_book USING gin (UPPER({column}) gin_trgm_ops)"
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for column in TRGM_COLUMNS:
+        schema_editor.execute(f"DROP INDEX IF EXISTS catalog_book_{column}_trgm")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0004_category_book_edition_year_book_language_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
@@ -112,6 +112,15 @@ class Loan(models.Model):
 				name="loan_due_after_borrowed",
 			),
 		]
+		indexes = [
+			# Índice parcial só com empréstimos ativos: atende a contagem de
+			# active_loans (book_list) e os filtros por livro + returned_at nulo.
+			models.Index(
+				fields=["book"],
+				condition=Q(returned_at__isnull=True),
+				name="loan_active_idx",
+			),
+		]
 
 	def __str__(self) -> str:
 		status = "devolvido" if self.returned_at else "emprestado"
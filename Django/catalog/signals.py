@@ -0,0 +1,18 @@
+"""Sinais que mantêm o cache de `cache.py` coerente com o banco."""
+
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import CATEGORIES_KEY, LANGUAGES_KEY
+from .models import Book, Category
+
+
+@receiver([post_save, post_delete], sender=Category)
+def invalidate_categories(sender, **kwargs):
+	cache.delete(CATEGORIES_KEY)
+
+
+@receiver([post_save, post_delete], sender=Book)
+def invalidate_languages(sender, **kwargs):
+	cache.delete(LANGUAGES_KEY)
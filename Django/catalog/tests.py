@@ -1,10 +1,18 @@
 from datetime import timedelta
+from io import BytesIO
+from unittest import mock
 
+from django.contrib.admin.sites import site
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.contrib.sessions.backends.db import SessionStore
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase
 from django.utils import timezone
+from openpyxl import load_workbook
 
-from .models import Book, Loan
+from .cache import get_categories, get_languages
+from .models import Book, Category, Loan, SearchQuery
+from .views import book_list
 
 
 class LoanModelTests(TestCase):
@@ -47,3 +55,186 @@ class AuthViewsTests(TestCase):
 		resp_post = self.client.post("/logout/")
 		self.assertEqual(resp_post.status_code, 302)
 		self.assertIn("/login/", resp_post.headers.get("Location", ""))
+
+
+class BookListExportTests(TestCase):
+	def setUp(self):
+		self.user = get_user_model().objects.create_user("u3", password="pass")
+		self.client.login(username="u3", password="pass")
+		romance = Category.objects.create(name="Romance")
+		Book.objects.create(title="Dom Casmurro", author="Machado de Assis", isbn="9788535910663", copies_total=1, category=romance)
+		Book.objects.create(title="O Cortiço", author="Aluísio Azevedo", isbn="9788508133631", copies_total=1, category=romance)
+
+	def test_csv_export_is_streamed(self):
+		resp = self.client.get("/", {"export": "csv"})
+		self.assertEqual(resp.status_code, 200)
+		self.assertTrue(resp.streaming)
+		content = b"".join(resp.streaming_content).decode("utf-8")
+		self.assertIn("Título,Autor,ISBN", content)
+		self.assertIn("Dom Casmurro,Machado de Assis,9788535910663,1,Romance", content)
+
+	def test_csv_export_fetches_categories_in_same_query(self):
+		# sessão + usuário + um único SELECT de livros (com a categoria via JOIN)
+		with self.assertNumQueries(3):
+			resp = self.client.get("/", {"export": "csv"})
+			b"".join(resp.streaming_content)
+
+	def test_search_history_csv_export(self):
+		SearchQuery.objects.create(user=self.user, q="machado", params={"idioma": "pt"})
+		resp = self.client.get("/me/searches/", {"export": "csv"})
+		content = b"".join(resp.streaming_content).decode("utf-8")
+		self.assertIn("machado,{'idioma': 'pt'}", content)
+
+	def test_xlsx_export_returns_workbook(self):
+		resp = self.client.get("/", {"export": "xlsx"})
+		self.assertEqual(resp.status_code, 200)
+		self.assertIn("livros.xlsx", resp["Content-Disposition"])
+		ws = load_workbook(BytesIO(b"".join(resp.streaming_content))).active
+		self.assertEqual(ws.title, "Livros")
+		self.assertEqual(ws["A2"].value, "Dom Casmurro")
+
+
+class BookListViewTests(TestCase):
+	def setUp(self):
+		# O cache LocMem sobrevive entre testes (rollback não dispara sinais)
+		cache.clear()
+		self.user = get_user_model().objects.create_user("u4", password="pass")
+		self.client.login(username="u4", password="pass")
+		for i in range(25):
+			Book.objects.create(title=f"Livro {i:02d}", author="Autor", isbn=f"{i:013d}", copies_total=1)
+
+	def test_total_count_paginated_and_all(self):
+		resp = self.client.get("/")
+		self.assertEqual(resp.context["total_count"], 25)
+		self.assertEqual(len(resp.context["books"]), 20)
+		resp = self.client.get("/", {"mostrar": "todos"})
+		self.assertEqual(resp.context["total_count"], 25)
+
+	def test_html_page_query_count_is_constant(self):
+		for book in Book.objects.all()[:5]:
+			Loan.objects.create(book=book, user=self.user, due_date=timezone.localdate())
+		# sessão + usuário + COUNT do paginator + SELECT dos livros + categorias
+		with self.assertNumQueries(5) as ctx:
+			resp = self.client.get("/")
+		self.assertContains(resp, "Emprestar", count=15)
+		# a listagem HTML não faz JOIN com categoria (só as exportações precisam)
+		books_sql = next(q["sql"] for q in ctx.captured_queries if 'FROM "catalog_book"' in q["sql"] and "LIMIT" in q["sql"])
+		self.assertNotIn("catalog_category", books_sql)
+
+	def test_disponivel_filter_uses_available_copies(self):
+		emprestado = Book.objects.get(title="Livro 00")
+		Loan.objects.create(book=emprestado, user=self.user, due_date=timezone.localdate())
+		resp = self.client.get("/", {"disponivel": "1", "mostrar": "todos"})
+		self.assertEqual(resp.context["total_count"], 24)
+		self.assertNotIn(emprestado, resp.context["books"])
+
+	def test_invalid_numeric_params_are_ignored(self):
+		Book.objects.filter(title="Livro 00").update(edition_year=1990)
+		resp = self.client.get("/", {"ano_min": "2000x", "categoria": "abc"})
+		self.assertEqual(resp.context["total_count"], 25)
+		resp = self.client.get("/", {"categoria": "-1", "ano_max": "-5"})
+		self.assertEqual(resp.context["total_count"], 25)
+		resp = self.client.get("/", {"ano_min": "1980", "ano_max": "1995"})
+		self.assertEqual(resp.context["total_count"], 1)
+
+	def test_mostrar_todos_falls_back_to_pagination_above_limit(self):
+		# sessão + usuário + ids (limite) + COUNT do paginator + página + categorias + mensagens
+		with mock.patch("catalog.views.MAX_UNPAGINATED", 10), self.assertNumQueries(6) as ctx:
+			resp = self.client.get("/", {"mostrar": "todos"})
+		self.assertIn('SELECT "catalog_book"."id" AS "pk" FROM', ctx.captured_queries[2]["sql"])
+		self.assertEqual(resp.context["mostrar"], "20")
+		self.assertEqual(resp.context["total_count"], 25)
+		self.assertEqual(len(resp.context["books"]), 20)
+
+	def test_suggest_uses_single_query(self):
+		# sessão + usuário + uma única consulta de sugestões
+		with self.assertNumQueries(3):
+			resp = self.client.get("/", {"suggest": "1", "q": "Livro 0"})
+		data = resp.json()
+		self.assertEqual(len(data["titles"]), 8)
+		self.assertEqual(data["authors"], ["Autor"])
+
+	def test_search_is_recorded_after_response(self):
+		self.client.get("/", {"q": "Livro"})
+		self.client.get("/")  # sem filtros: não grava
+		self.assertEqual(list(SearchQuery.objects.values_list("q", flat=True)), ["Livro"])
+
+	def test_search_history_keeps_numeric_params_as_text(self):
+		self.client.get("/", {"ano_min": "1990", "categoria": "3"})
+		params = SearchQuery.objects.get().params
+		self.assertEqual((params["ano_min"], params["categoria"], params["ano_max"]), ("1990", "3", None))
+
+	def test_search_is_saved_only_when_response_is_closed(self):
+		request = RequestFactory().get("/", {"q": "Livro"})
+		request.user = self.user
+		request.session = SessionStore()
+		response = book_list(request)
+		self.assertFalse(SearchQuery.objects.exists())
+		response.close()
+		self.assertEqual(SearchQuery.objects.get().q, "Livro")
+
+
+class SearchFormCacheTests(TestCase):
+	def setUp(self):
+		cache.clear()
+
+	def test_cache_invalidated_on_save_and_delete(self):
+		self.assertEqual(get_categories(), [])
+		cat = Category.objects.create(name="Romance")
+		self.assertEqual([c.name for c in get_categories()], ["Romance"])
+		with self.assertNumQueries(0):
+			get_categories()
+		cat.delete()
+		self.assertEqual(get_categories(), [])
+
+	def test_languages_cached_and_invalidated_on_book_save(self):
+		book = Book.objects.create(title="A", author="B", isbn="3333333333333", language="Português")
+		Book.objects.create(title="C", author="D", isbn="4444444444444", language="Português")
+		self.assertEqual(get_languages(), ["Português"])
+		with self.assertNumQueries(0):
+			get_languages()
+		book.language = "Inglês"
+		book.save()
+		self.assertEqual(get_languages(), ["Inglês", "Português"])
+
+
+class LoanAdminTests(TestCase):
+	def test_marcar_como_devolvido_updates_only_active_loans(self):
+		user = get_user_model().objects.create_user("u5", password="pass")
+		book = Book.objects.create(title="Teste", author="Autor", isbn="1111111111111", copies_total=3)
+		due = timezone.localdate() + timedelta(days=7)
+		ativo = Loan.objects.create(book=book, user=user, due_date=due)
+		devolvido = Loan.objects.create(book=book, user=user, due_date=due)
+		devolvido.mark_returned()
+		returned_at = Loan.objects.get(pk=devolvido.pk).returned_at
+
+		model_admin = site._registry[Loan]
+		request = RequestFactory().post("/")
+		with mock.patch.object(model_admin, "message_user") as message_user:
+			model_admin.marcar_como_devolvido(request, Loan.objects.all())
+
+		self.assertIsNotNone(Loan.objects.get(pk=ativo.pk).returned_at)
+		self.assertEqual(Loan.objects.get(pk=devolvido.pk).returned_at, returned_at)
+		message_user.assert_called_once_with(request, "1 empréstimo(s) marcados como devolvidos.")
+
+
+class LoanViewsTests(TestCase):
+	def setUp(self):
+		self.user = get_user_model().objects.create_user("u6", password="pass")
+		self.client.login(username="u6", password="pass")
+		self.book = Book.objects.create(title="Teste", author="Autor", isbn="2222222222222", copies_total=1)
+
+	def test_borrow_respects_copies_total(self):
+		self.client.post(f"/borrow/{self.book.id}/")
+		self.client.post(f"/borrow/{self.book.id}/")
+		self.assertEqual(Loan.objects.filter(book=self.book).count(), 1)
+
+	def test_borrow_requires_post(self):
+		self.assertEqual(self.client.get(f"/borrow/{self.book.id}/").status_code, 404)
+
+	def test_return_book_marks_loan_returned(self):
+		loan = Loan.objects.create(book=self.book, user=self.user, due_date=timezone.localdate())
+		resp = self.client.post(f"/return/{loan.id}/")
+		self.assertRedirects(resp, "/me/loans/")
+		loan.refresh_from_db()
+		self.assertIsNotNone(loan.returned_at)
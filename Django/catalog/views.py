@@ -4,19 +4,28 @@ Cada função abaixo recebe um `request` e retorna uma `HttpResponse`.
 Os comentários explicam passo a passo o que cada view faz.
 """
 
+from dataclasses import dataclass
 from datetime import timedelta
+from tempfile import SpooledTemporaryFile
 
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.core.paginator import Paginator
-from django.db.models import Count, F, Q, Value
-from django.db.models.functions import Lower
-from django.http import JsonResponse
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, Q, Value
+from django.db.models.functions import Greatest, Lower
+from django.http import FileResponse, JsonResponse, StreamingHttpResponse
 from django.http import Http404, HttpRequest, HttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
+from django.template.loader import render_to_string
 from django.utils import timezone
 
-from .models import Book, Loan, Category, SearchQuery
+from .cache import get_categories, get_languages
+from .models import Book, Loan, SearchQuery
+
+
+# Limite de livros exibidos de uma vez com mostrar=todos
+MAX_UNPAGINATED = 500
 
 
 def _is_staff(user):
@@ -27,6 +36,120 @@ def _is_staff(user):
 	return user.is_authenticated and user.is_staff
 
 
+class _Echo:
+	"""Pseudo-arquivo para o `csv.writer`.
+
+	Em vez de acumular o texto num buffer, `write` apenas devolve a linha
+	formatada; assim cada linha pode ser enviada ao cliente assim que é gerada
+	(via StreamingHttpResponse), sem carregar o CSV inteiro na memória.
+	"""
+
+	def write(self, value):
+		return value
+
+
+class _SearchHistoryResponse(HttpResponse):
+	"""HttpResponse que grava o histórico da busca ao ser fechada.
+
+	O servidor chama `close()` depois de enviar o corpo ao cliente, então o
+	INSERT fica fora do caminho crítico da requisição. Gravamos antes de
+	`super().close()`, que encerra as conexões com o banco da requisição.
+	"""
+
+	def __init__(self, *args, busca: SearchQuery | None = None, **kwargs):
+		super().__init__(*args, **kwargs)
+		self.busca = busca
+
+	def close(self):
+		try:
+			if self.busca is not None:
+				self.busca.save()
+		finally:
+			super().close()
+
+
+def _xlsx_response(wb, filename: str) -> FileResponse:
+	"""Salva a planilha num arquivo temporário e devolve como download.
+
+	O SpooledTemporaryFile fica em memória enquanto pequeno e vai para o disco
+	se crescer; o FileResponse envia o conteúdo em blocos, sem o `getvalue()`
+	que duplicaria a planilha inteira na memória.
+	"""
+	tmp = SpooledTemporaryFile(max_size=1024 * 1024)
+	wb.save(tmp)
+	tmp.seek(0)
+	return FileResponse(
+		tmp,
+		as_attachment=True,
+		filename=filename,
+		content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+	)
+
+
+def _as_int(value: str | None) -> int | None:
+	"""Converte um parâmetro GET para int não negativo; None se ausente ou inválido."""
+	try:
+		number = int(value)
+	except (TypeError, ValueError):
+		return None
+	return number if number >= 0 else None
+
+
+def _as_str(value: int | None) -> str | None:
+	"""Volta um parâmetro numérico para texto (None continua None)."""
+	return None if value is None else str(value)
+
+
+@dataclass(frozen=True, slots=True)
+class BookListParams:
+	"""Parâmetros GET de `book_list`, lidos uma única vez por requisição.
+
+	Os textos já vêm sem espaços nas pontas; categoria/ano_min/ano_max já vêm
+	convertidos para int (None quando ausentes ou inválidos).
+	"""
+
+	q: str = ""
+	title: str = ""
+	author: str = ""
+	isbn: str = ""
+	disponivel: bool = False
+	categoria: int | None = None
+	idioma: str = ""
+	ano_min: int | None = None
+	ano_max: int | None = None
+	ordenar: str = "title"
+	mostrar: str = "20"
+	page: str | None = None
+	suggest: bool = False
+	export: str | None = None
+
+	@classmethod
+	def from_request(cls, request: HttpRequest) -> "BookListParams":
+		data = request.GET
+		return cls(
+			q=data.get("q", "").strip(),
+			title=data.get("title", "").strip(),
+			author=data.get("author", "").strip(),
+			isbn=data.get("isbn", "").strip(),
+			disponivel=data.get("disponivel") == "1",
+			categoria=_as_int(data.get("categoria")),
+			idioma=data.get("idioma", "").strip(),
+			ano_min=_as_int(data.get("ano_min")),
+			ano_max=_as_int(data.get("ano_max")),
+			ordenar=data.get("ordenar", "title"),
+			mostrar=data.get("mostrar", "20"),
+			page=data.get("page"),
+			suggest=data.get("suggest") == "1",
+			export=data.get("export"),
+		)
+
+	def has_filters(self) -> bool:
+		"""Indica se algum termo ou filtro foi usado (define se grava histórico)."""
+		return any([
+			self.q, self.title, self.author, self.isbn, self.disponivel, self.idioma,
+		]) or any(v is not None for v in (self.categoria, self.ano_min, self.ano_max))
+
+
 @login_required
 def book_list(request: HttpRequest) -> HttpResponse:
 	"""Lista livros com busca, filtros, ordenação, paginação e exportação.
@@ -38,180 +161,202 @@ def book_list(request: HttpRequest) -> HttpResponse:
 	- idioma: filtra campo language.
 	- ano_min / ano_max: faixa de ano de edição.
 	- ordenar: campo de ordenação (title|author|disponibilidade); sempre crescente.
-	- mostrar: '20' (padrão) ou 'todos'.
+	- mostrar: '20' (padrão) ou 'todos' (até MAX_UNPAGINATED livros; acima disso, pagina).
 	- export=csv: retorna CSV em vez de HTML.
 
 	Também grava histórico da busca (SearchQuery) e provê endpoint de
 	sugestões (se chamado como /?suggest=1&q=prefixo).
 	"""
 
-	# Queryset base com anotação de empréstimos ativos
-	qs = Book.objects.all().annotate(
+	# Queryset base com anotação de empréstimos ativos.
+	# select_related traz a categoria no mesmo SELECT (evita uma consulta por livro nas exportações).
+	qs = Book.objects.select_related("category").annotate(
 		active_loans=Count("loans", filter=Q(loans__returned_at__isnull=True))
+	).annotate(
+		# Cópias disponíveis calculadas no banco (nunca negativas)
+		disponiveis=Greatest(F("copies_total") - F("active_loans"), Value(0), output_field=IntegerField()),
 	)
 
+	# Lê todos os parâmetros GET uma única vez
+	params = BookListParams.from_request(request)
+	q = params.q
+
+	# Sugestões (autocomplete) modo simples: retorna JSON.
+	# Uma única consulta estreita, sem a anotação de empréstimos (desnecessária aqui).
+	if params.suggest and q:
+		limite = 8
+		rows = (
+			Book.objects.filter(Q(title__icontains=q) | Q(author__icontains=q) | Q(isbn__icontains=q))
+			.order_by(Lower("title"))
+			.values_list("title", "author", "isbn")[: limite * 3]
+		)
+		titulos, autores, isbns = [], [], []
+		for title, author, isbn in rows:
+			# Mantém a ordem e ignora repetidos (ex.: vários livros do mesmo autor)
+			for valor, lista in ((title, titulos), (author, autores), (isbn, isbns)):
+				if valor not in lista and len(lista) < limite:
+					lista.append(valor)
+		return JsonResponse({"titles": titulos, "authors": autores, "isbns": isbns})
+
 	# Termo de busca livre (campo único) OU campos individuais vindos da busca avançada
-	q = request.GET.get("q", "").strip()
-	title_param = request.GET.get("title", "").strip()
-	author_param = request.GET.get("author", "").strip()
-	isbn_param = request.GET.get("isbn", "").strip()
 	if q:
+		# No PostgreSQL estes icontains usam os índices trigram (GIN) da migração 0005
 		qs = qs.filter(
 			Q(title__icontains=q) | Q(author__icontains=q) | Q(isbn__icontains=q)
 		)
 	else:
 		# Se a busca avançada forneceu campos específicos, aplicamos cada filtro separadamente
-		if title_param:
-			qs = qs.filter(title__icontains=title_param)
-		if author_param:
-			qs = qs.filter(author__icontains=author_param)
-		if isbn_param:
-			qs = qs.filter(isbn__icontains=isbn_param)
+		if params.title:
+			qs = qs.filter(title__icontains=params.title)
+		if params.author:
+			qs = qs.filter(author__icontains=params.author)
+		if params.isbn:
+			qs = qs.filter(isbn__icontains=params.isbn)
 
 	# Filtro disponibilidade
-	show_only_available = request.GET.get("disponivel") == "1"
-	if show_only_available:
-		qs = qs.filter(active_loans__lt=F("copies_total"))
+	if params.disponivel:
+		qs = qs.filter(disponiveis__gt=0)
 
 	# Filtro por categoria
-	categoria_id = request.GET.get("categoria")
-	if categoria_id and categoria_id.isdigit():
-		qs = qs.filter(category_id=categoria_id)
+	if params.categoria is not None:
+		qs = qs.filter(category_id=params.categoria)
 
 	# Filtro por idioma
-	idioma = request.GET.get("idioma", "").strip()
-	if idioma:
-		qs = qs.filter(language__iexact=idioma)
+	if params.idioma:
+		qs = qs.filter(language__iexact=params.idioma)
 
 	# Faixa de ano
-	ano_min = request.GET.get("ano_min")
-	ano_max = request.GET.get("ano_max")
-	if ano_min and ano_min.isdigit():
-		qs = qs.filter(edition_year__gte=int(ano_min))
-	if ano_max and ano_max.isdigit():
-		qs = qs.filter(edition_year__lte=int(ano_max))
+	if params.ano_min is not None:
+		qs = qs.filter(edition_year__gte=params.ano_min)
+	if params.ano_max is not None:
+		qs = qs.filter(edition_year__lte=params.ano_max)
 
 	# Ordenação dinâmica (sempre crescente)
-	ordenar = request.GET.get("ordenar", "title")
+	ordenar = params.ordenar
 	if ordenar == "author":
 		qs = qs.order_by(Lower("author"), "title")
 	elif ordenar == "disponibilidade":
-		# ordenar por cópias disponíveis calculadas: (copies_total - active_loans)
-		qs = qs.annotate(disponiveis=F("copies_total") - F("active_loans")).order_by("disponiveis", "title")
+		# ordenar por cópias disponíveis (anotação 'disponiveis' do queryset base)
+		qs = qs.order_by("disponiveis", "title")
 	else:  # default título
 		qs = qs.order_by(Lower("title"))
 
-	# Sugestões (autocomplete) modo simples: retorna JSON
-	if request.GET.get("suggest") == "1" and q:
-		limite = 8
-		titulos = list(qs.values_list("title", flat=True)[:limite])
-		autores = list(qs.values_list("author", flat=True)[:limite])
-		isbns = list(qs.values_list("isbn", flat=True)[:limite])
-		return JsonResponse({"titles": titulos, "authors": autores, "isbns": isbns})
-
 	# Exportação CSV
-	if request.GET.get("export") == "csv":
+	if params.export == "csv":
 		import csv
-		from io import StringIO
-		buffer = StringIO()
-		writer = csv.writer(buffer)
-		writer.writerow(["Título", "Autor", "ISBN", "Disponíveis", "Categoria", "Idioma", "Ano"])
-		for b in qs:
-			writer.writerow([
-				b.title,
-				b.author,
-				b.isbn,
-				max(b.copies_total - b.active_loans, 0),
-				b.category.name if b.category else "",
-				b.language,
-				b.edition_year or "",
-			])
-		response = HttpResponse(buffer.getvalue(), content_type="text/csv; charset=utf-8")
+		writer = csv.writer(_Echo())
+
+		def rows():
+			# Gera uma linha por vez; iterator() busca os livros em lotes sem cache
+			yield writer.writerow(["Título", "Autor", "ISBN", "Disponíveis", "Categoria", "Idioma", "Ano"])
+			for b in qs.iterator(chunk_size=2000):
+				yield writer.writerow([
+					b.title,
+					b.author,
+					b.isbn,
+					b.disponiveis,
+					b.category.name if b.category else "",
+					b.language,
+					b.edition_year or "",
+				])
+
+		response = StreamingHttpResponse(rows(), content_type="text/csv; charset=utf-8")
 		response["Content-Disposition"] = "attachment; filename=livros.csv"
 		return response
 
 	# Exportação Excel (XLSX) – requer openpyxl instalado
-	if request.GET.get("export") == "xlsx":
+	if params.export == "xlsx":
 		try:
 			from openpyxl import Workbook
 		except ImportError:
 			return HttpResponse("Biblioteca 'openpyxl' não instalada. Execute 'pip install openpyxl'.", status=500)
-		wb = Workbook()
-		ws = wb.active
-		ws.title = "Livros"
+		# write_only: as linhas vão para um arquivo temporário à medida que são adicionadas
+		wb = Workbook(write_only=True)
+		ws = wb.create_sheet("Livros")
 		ws.append(["Título", "Autor", "ISBN", "Disponíveis", "Categoria", "Idioma", "Ano"])
-		for b in qs:
+		for b in qs.iterator(chunk_size=2000):
 			ws.append([
 				b.title,
 				b.author,
 				b.isbn,
-				max(b.copies_total - b.active_loans, 0),
+				b.disponiveis,
 				b.category.name if b.category else "",
 				b.language,
 				b.edition_year or "",
 			])
-		from io import BytesIO
-		buff = BytesIO()
-		wb.save(buff)
-		response = HttpResponse(buff.getvalue(), content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
-		response["Content-Disposition"] = "attachment; filename=livros.xlsx"
-		return response
+		return _xlsx_response(wb, "livros.xlsx")
+
+	# Na listagem HTML buscamos só as colunas usadas pelo template (as anotações
+	# active_loans/disponiveis continuam no SELECT); exportações mantêm tudo.
+	# O template não mostra a categoria, então o JOIN das exportações sai daqui.
+	qs = qs.select_related(None).only("title", "author", "isbn", "copies_total", "image")
 
 	# Paginação
-	mostrar_param = request.GET.get("mostrar", "20")
+	mostrar_param = params.mostrar
+	page_obj = None
 	if mostrar_param == "todos":
-		page_obj = None
-		books = qs
-	else:
+		# Para decidir, buscamos só os ids de até MAX_UNPAGINATED + 1 livros: se
+		# passar do limite, voltamos para a paginação; senão carregamos os livros.
+		ids = qs.order_by().values_list("pk", flat=True)[: MAX_UNPAGINATED + 1]
+		if len(ids) > MAX_UNPAGINATED:
+			messages.info(request, f"Mais de {MAX_UNPAGINATED} livros encontrados; exibindo com paginação.")
+			mostrar_param = "20"
+		else:
+			books = list(qs)
+	if mostrar_param != "todos":
 		paginator = Paginator(qs, 20)
-		page_number = request.GET.get("page")
-		page_obj = paginator.get_page(page_number)
+		page_obj = paginator.get_page(params.page)
 		books = page_obj.object_list
+	# Reaproveita o COUNT já feito pelo paginator (ou a lista já carregada em 'todos')
+	total_count = page_obj.paginator.count if page_obj else len(books)
 
-	# Salva histórico da busca (apenas se algum filtro ou termo usado)
-	if any([q, title_param, author_param, isbn_param, show_only_available, categoria_id, idioma, ano_min, ano_max]):
+	# Histórico da busca (apenas se algum filtro ou termo usado).
+	# O INSERT só acontece depois que a página foi enviada (ver _SearchHistoryResponse).
+	busca = None
+	if params.has_filters():
 		session_key = request.session.session_key or ""
 		if not session_key:
 			request.session.create()
 			session_key = request.session.session_key
-		try:
-			SearchQuery.objects.create(
-				user=request.user if request.user.is_authenticated else None,
-				session_key=session_key,
-				q=q,
-				params={
-					"disponivel": show_only_available,
-					"categoria": categoria_id,
-					"idioma": idioma,
-					"ano_min": ano_min,
-					"ano_max": ano_max,
-					"ordenar": ordenar,
-					"title": title_param,
-					"author": author_param,
-					"isbn": isbn_param,
-				},
-			)
-		except Exception:  # pragma: no cover - não falha a página por erro no histórico
-			pass
+		busca = SearchQuery(
+			user=request.user if request.user.is_authenticated else None,
+			session_key=session_key,
+			q=q,
+			params={
+				"disponivel": params.disponivel,
+				# Guardados como texto, no mesmo formato do histórico já gravado
+				"categoria": _as_str(params.categoria),
+				"idioma": params.idioma,
+				"ano_min": _as_str(params.ano_min),
+				"ano_max": _as_str(params.ano_max),
+				"ordenar": ordenar,
+				"title": params.title,
+				"author": params.author,
+				"isbn": params.isbn,
+			},
+		)
 
 	context = {
 		"books": books,
 		"page_obj": page_obj,
 		"q": q,
-		"show_only_available": show_only_available,
+		"show_only_available": params.disponivel,
 		"mostrar": mostrar_param,
-		"total_count": qs.count(),
+		"total_count": total_count,
 		"ordenar": ordenar,
-		"categorias": Category.objects.all(),
-		"categoria_selecionada": categoria_id,
-		"idioma": idioma,
-		"ano_min": ano_min or "",
-		"ano_max": ano_max or "",
-		"title_param": title_param,
-		"author_param": author_param,
-		"isbn_param": isbn_param,
+		"categorias": get_categories(),
+		# O template compara com o id da categoria como texto
+		"categoria_selecionada": "" if params.categoria is None else str(params.categoria),
+		"idioma": params.idioma,
+		"ano_min": "" if params.ano_min is None else params.ano_min,
+		"ano_max": "" if params.ano_max is None else params.ano_max,
+		"title_param": params.title,
+		"author_param": params.author,
+		"isbn_param": params.isbn,
 	}
-	return render(request, "catalog/book_list.html", context)
+	return _SearchHistoryResponse(
+		render_to_string("catalog/book_list.html", context, request), busca=busca
+	)
 
 
 @login_required
@@ -222,24 +367,29 @@ def search_history(request: HttpRequest) -> HttpResponse:
 	- export=csv|xlsx para baixar histórico.
 	"""
 	if request.user.is_authenticated:
-		qs = SearchQuery.objects.filter(user=request.user)[:100]
+		qs = SearchQuery.objects.filter(user=request.user)
 	else:
 		session_key = request.session.session_key
 		if not session_key:
-			qs = []
+			qs = SearchQuery.objects.none()
 		else:
-			qs = SearchQuery.objects.filter(session_key=session_key)[:100]
+			qs = SearchQuery.objects.filter(session_key=session_key)
+
+	# Exportações leem só as três colunas como tuplas (sem instanciar o modelo).
+	# O queryset é preguiçoso: só consulta o banco se alguma exportação for pedida.
+	rows_db = qs.values_list("created_at", "q", "params")[:100]
 
 	export_format = request.GET.get("export")
 	if export_format == "csv":
 		import csv
-		from io import StringIO
-		buf = StringIO()
-		w = csv.writer(buf)
-		w.writerow(["Data/Hora", "Termo livre (q)", "Parâmetros JSON"])
-		for s in qs:
-			w.writerow([s.created_at.strftime("%Y-%m-%d %H:%M"), s.q, s.params])
-		resp = HttpResponse(buf.getvalue(), content_type="text/csv; charset=utf-8")
+		w = csv.writer(_Echo())
+
+		def rows():
+			yield w.writerow(["Data/Hora", "Termo livre (q)", "Parâmetros JSON"])
+			for created_at, q, params in rows_db:
+				yield w.writerow([created_at.strftime("%Y-%m-%d %H:%M"), q, params])
+
+		resp = StreamingHttpResponse(rows(), content_type="text/csv; charset=utf-8")
 		resp["Content-Disposition"] = "attachment; filename=historico_buscas.csv"
 		return resp
 	elif export_format == "xlsx":
@@ -247,20 +397,14 @@ def search_history(request: HttpRequest) -> HttpResponse:
 			from openpyxl import Workbook
 		except ImportError:
 			return HttpResponse("Biblioteca 'openpyxl' não instalada. Execute 'pip install openpyxl'.", status=500)
-		wb = Workbook()
-		ws = wb.active
-		ws.title = "Buscas"
+		wb = Workbook(write_only=True)
+		ws = wb.create_sheet("Buscas")
 		ws.append(["Data/Hora", "Termo livre (q)", "Parâmetros JSON"])
-		for s in qs:
-			ws.append([s.created_at.strftime("%Y-%m-%d %H:%M"), s.q, str(s.params)])
-		from io import BytesIO
-		buff = BytesIO()
-		wb.save(buff)
-		resp = HttpResponse(buff.getvalue(), content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
-		resp["Content-Disposition"] = "attachment; filename=historico_buscas.xlsx"
-		return resp
+		for created_at, q, params in rows_db:
+			ws.append([created_at.strftime("%Y-%m-%d %H:%M"), q, str(params)])
+		return _xlsx_response(wb, "historico_buscas.xlsx")
 
-	return render(request, "catalog/search_history.html", {"searches": qs})
+	return render(request, "catalog/search_history.html", {"searches": qs[:100]})
 
 
 @login_required
@@ -271,16 +415,10 @@ def advanced_search(request: HttpRequest) -> HttpResponse:
 	a lógica existente de filtros. Campos individuais (title, author, isbn)
 	são tratados em `book_list`.
 	"""
-	languages = (
-		Book.objects.exclude(language="")
-		.values_list("language", flat=True)
-		.distinct()
-		.order_by("language")
-	)
 	return render(
 		request,
 		"catalog/advanced_search.html",
-		{"categorias": Category.objects.all(), "languages": languages},
+		{"categorias": get_categories(), "languages": get_languages()},
 	)
 
 
@@ -306,25 +444,31 @@ def signup(request: HttpRequest) -> HttpResponse:
 def borrow_book(request: HttpRequest, book_id: int) -> HttpResponse:
 	"""Realiza um empréstimo (deve ser chamado por POST).
 
-	- Buscamos o livro; se não existir, 404.
 	- Garantimos que a ação é POST (boas práticas REST para mudar estado).
+	- Buscamos o livro travando a linha (select_for_update); se não existir, 404.
 	- Verificamos disponibilidade: se não houver cópias, mostramos mensagem.
 	- Criamos o Loan com data de devolução padrão de 14 dias a partir de hoje.
+
+	A verificação e a criação ficam na mesma transação, com o livro travado:
+	dois empréstimos simultâneos do mesmo título são serializados e não
+	conseguem ultrapassar copies_total.
 	"""
-	book = get_object_or_404(Book, id=book_id)
 	# Bloqueia GET; somente POST pode criar empréstimo
 	if request.method != "POST":
 		raise Http404()
 
-	# Conta quantos empréstimos do livro ainda estão ativos
-	active_loans = Loan.objects.filter(book=book, returned_at__isnull=True).count()
-	if active_loans >= book.copies_total:
-		messages.error(request, "Não há cópias disponíveis para empréstimo.")
-		return redirect("catalog:book_list")
+	with transaction.atomic():
+		book = get_object_or_404(Book.objects.select_for_update(), id=book_id)
+
+		# Conta quantos empréstimos do livro ainda estão ativos
+		active_loans = Loan.objects.filter(book=book, returned_at__isnull=True).count()
+		if active_loans >= book.copies_total:
+			messages.error(request, "Não há cópias disponíveis para empréstimo.")
+			return redirect("catalog:book_list")
 
-	# Padrão: 14 dias para devolver
-	due_date = timezone.localdate() + timedelta(days=14)
-	Loan.objects.create(book=book, user=request.user, due_date=due_date)
+		# Padrão: 14 dias para devolver
+		due_date = timezone.localdate() + timedelta(days=14)
+		Loan.objects.create(book=book, user=request.user, due_date=due_date)
 	messages.success(request, f"Você emprestou '{book.title}'. Devolução até {due_date:%d/%m/%Y}.")
 	return redirect("catalog:book_list")
 
@@ -332,7 +476,8 @@ def borrow_book(request: HttpRequest, book_id: int) -> HttpResponse:
 @login_required
 def return_book(request: HttpRequest, loan_id: int) -> HttpResponse:
 	"""Registra a devolução do livro (POST)."""
-	loan = get_object_or_404(Loan, id=loan_id, user=request.user)
+	# select_related: o título do livro usado na mensagem vem no mesmo SELECT
+	loan = get_object_or_404(Loan.objects.select_related("book"), id=loan_id, user=request.user)
 	if request.method != "POST":
 		raise Http404()
 	if loan.returned_at:
@@ -369,7 +514,7 @@ def admin_overdue_loans(request: HttpRequest) -> HttpResponse:
 @user_passes_test(_is_staff)
 def admin_mark_returned(request: HttpRequest, loan_id: int) -> HttpResponse:
 	"""Ação de staff para marcar um empréstimo como devolvido (POST)."""
-	loan = get_object_or_404(Loan, id=loan_id)
+	loan = get_object_or_404(Loan.objects.select_related("book"), id=loan_id)
 	if request.method != "POST":
 		raise Http404()
 	if not loan.returned_at:
@@ -11,8 +11,14 @@ maiúsculas/minúsculas).
 Refazer
 
 """""
+# Tabela que apaga as vogais (com e sem acento): vogais = tamanho original - tamanho sem vogais
+_VOGAIS = 'aeiouáéíóúàâêôãõü'
+_APAGA_VOGAIS = str.maketrans('', '', _VOGAIS + _VOGAIS.upper())
+
+
 class String:
-    
+    __slots__ = ('texto',)
+
     def __init__(self, texto):
         self.texto = texto
 
@@ -26,11 +32,10 @@ class String:
         return self.texto.lower()
 
     def contar_vogais(self):
-        vogais = 'aeiouAEIOU'
-        return sum(1 for c in self.texto if c in vogais)
+        return len(self.texto) - len(self.texto.translate(_APAGA_VOGAIS))
 
     def contem_ifb(self):
-        return 'ifb' in self.texto.lower()
+        return 'ifb' in self.texto.casefold()
 
     def exibir_resultados(self):
         print("Número de caracteres:", self.contar_caracteres())
@@ -19,6 +19,8 @@ organização orientada a objetos.
 
 class Produto:
 #atributos privados da classe (Não acessiveis fora da classe)
+#__slots__ usa os nomes "mangled" (_Produto__nome...) que o Python gera para atributos com __
+    __slots__ = ('_Produto__nome', '_Produto__preco', '_Produto__quantidade')
     
     def __init__(self, nome, preco, quantidade):
         self.__nome = nome
@@ -51,6 +53,7 @@ class Produto:
 #classe carrinho de compras, que vai guardar as manipulações dos produtos
 
 class CarrinhoDecompras:
+    __slots__ = ('produtos',)
     
     def __init__(self):
         self.produtos = []
@@ -59,28 +62,39 @@ class CarrinhoDecompras:
         self.produtos.append (produto)
 
     def remover_produto (self,nome):
-        
+        #remove todos os produtos com esse nome e retorna quantos foram removidos
+        nome_l = nome.lower()
+        #uma única passada separa os que ficam dos removidos
+        #(em vez de list.remove, que percorre a lista de novo a cada item)
+        mantidos, removidos = [], []
         for produto in self.produtos:
-            if produto.get_nome().lower() == nome.lower():
-                self.produtos.remove(produto)
-        print(f"Produto '{nome}' removido do carrinho.")
+            (removidos if produto.get_nome().lower() == nome_l else mantidos).append(produto)
+        if not removidos:
+            print(f"Produto '{nome}' não está no carrinho.")
+            return 0
+        self.produtos = mantidos
+        print(f"{len(removidos)} produto(s) '{nome}' removido(s) do carrinho.")
+        return len(removidos)
 
     def calcular_total (self):
-        
-        total = 0
-        for produto in self.produtos:
-            total += produto.get_preco() * produto.get_quantidade()
-        return total
+        #calculado na hora a partir dos produtos: sempre reflete set_preco/set_quantidade
+        #e não acumula resíduo de arredondamento de somas e subtrações sucessivas
+        return sum(produto.get_preco() * produto.get_quantidade() for produto in self.produtos)
     
     def listar_produtos (self):
         if not self.produtos:
             print("Carrinho está vazio !")
         else:
             print("\n--- Produtos no carrinho ---")
+            #soma o total na mesma passada que imprime os produtos
+            total = 0
             for produto in self.produtos:
-                print(f"{produto.get_nome()} - R${produto.get_preco():.2f} x {produto.get_quantidade()}")
+                preco = produto.get_preco()
+                quantidade = produto.get_quantidade()
+                print(f"{produto.get_nome()} - R${preco:.2f} x {quantidade}")
+                total += preco * quantidade
             print("----------------------------")
-            print(f"Total: R$ {self.calcular_total():.2f}")
+            print(f"Total: R$ {total:.2f}")
 
 if __name__== "__main__":
     carrinho = CarrinhoDecompras ()
@@ -100,8 +114,8 @@ if __name__== "__main__":
 
         elif escolha == 2:
             nome = input("Digite o nome do produto para remoção: ")
-            carrinho.remover_produto (nome)
-            print("O produto foi removido com sucesso !")
+            if carrinho.remover_produto (nome):
+                print("O produto foi removido com sucesso !")
 
         elif escolha == 3:
             carrinho.listar_produtos()